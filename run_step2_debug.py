@@ -4,9 +4,9 @@ import sys
 from step2 import merge_and_summarize, save_match_summaries, STEP2_JSON
 import time
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 
-TZ = pytz.timezone("America/New_York")
+TZ = ZoneInfo("America/New_York")
 
 # Load step1.json
 with open('step1.json', 'r') as f:
@@ -71,7 +71,7 @@ ensure_venv() {
     print_status "Checking and installing required packages..."
     
     # List of required packages with proper module names for import testing
-    REQUIRED_PACKAGES=("aiohttp" "python-dotenv:dotenv" "psutil" "requests" "pytz")
+    REQUIRED_PACKAGES=("aiohttp" "python-dotenv:dotenv" "psutil" "requests" "orjson")
     
     for package_spec in "${REQUIRED_PACKAGES[@]}"; do
         # Split package_spec into package name and import name (if different)
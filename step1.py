@@ -60,7 +60,7 @@ ERROR HANDLING:
 ENVIRONMENT REQUIREMENTS:
 ------------------------
 - API_KEY: Required in .env file or environment
-- Python packages: requests, python-dotenv, pytz
+- Python packages: requests, python-dotenv
 - Write permissions in current directory
 - Network access to TheSports API
 
@@ -77,7 +77,6 @@ import json
 import logging
 import logging.handlers
 import os
-import re
 import requests
 import shutil
 import signal
@@ -85,8 +84,8 @@ import subprocess
 import sys
 import time
 import traceback
-import pytz
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from collections import defaultdict
 from contextlib import contextmanager
 from dotenv import load_dotenv
@@ -591,6 +590,20 @@ COUNTRY_SCHEMA = """
 # These data points rarely change, so hitting them every minute is wasteful
 # Best practice: Cache on first fetch, then refresh hourly to ensure IDs still match names
 
+# Pipeline timezone (all timestamps are New York time)
+TZ = ZoneInfo("America/New_York")
+
+# Status ID descriptions for the raw API and comprehensive match breakdowns
+STATUS_DESCRIPTIONS = {
+    0: "Abnormal", 1: "Not started", 2: "First half", 3: "Half-time",
+    4: "Second half", 5: "Overtime", 6: "Overtime (deprecated)",
+    7: "Penalty Shoot-out", 8: "End", 9: "Delay", 10: "Interrupt",
+    11: "Cut in half", 12: "Cancel", 13: "To be determined"
+}
+
+# Official status wording (0 is flagged for hiding) for the status summaries and footer
+OFFICIAL_STATUS_DESCRIPTIONS = {**STATUS_DESCRIPTIONS, 0: "Abnormal (suggest hiding)"}
+
 # Daily match counter file
 COUNTER_FILE = "daily_match_counter.json"
 PID_FILE = "step1.pid"
@@ -658,21 +671,21 @@ async def enrich_match_data_async(matches):
                 res = detail_wrap.get("results") or detail_wrap.get("result") or []
                 if isinstance(res, list) and res:
                     detail = res[0]
-                    if detail.get("home_team_id"):
-                        team_ids.add(detail.get("home_team_id"))
-                    if detail.get("away_team_id"):
-                        team_ids.add(detail.get("away_team_id"))
-                    if detail.get("competition_id"):
-                        comp_ids.add(detail.get("competition_id"))
+                    if home_id := detail.get("home_team_id"):
+                        team_ids.add(home_id)
+                    if away_id := detail.get("away_team_id"):
+                        team_ids.add(away_id)
+                    if comp_id := detail.get("competition_id"):
+                        comp_ids.add(comp_id)
         
         # Also extract from original matches as fallback
         for match in matches:
-            if match.get("home_team_id"):
-                team_ids.add(match.get("home_team_id"))
-            if match.get("away_team_id"):
-                team_ids.add(match.get("away_team_id"))
-            if match.get("competition_id"):
-                comp_ids.add(match.get("competition_id"))
+            if home_id := match.get("home_team_id"):
+                team_ids.add(home_id)
+            if away_id := match.get("away_team_id"):
+                team_ids.add(away_id)
+            if comp_id := match.get("competition_id"):
+                comp_ids.add(comp_id)
 
         # Phase 2: teams + competitions + country
         team_tasks = [
@@ -757,8 +770,7 @@ def pid_lock():
 
 def get_daily_match_counter():
     """Get and increment the daily match counter, resetting at midnight EST."""
-    ny_tz = pytz.timezone("America/New_York")
-    now = datetime.now(ny_tz)
+    now = datetime.now(TZ)
     today_str = now.strftime("%Y-%m-%d")
     
     # Load existing counter data
@@ -788,8 +800,7 @@ def get_daily_match_counter():
 
 def get_ny_time_str(format_str="%m/%d/%Y %I:%M:%S %p EST"):
     """Get current time in New York timezone with custom format"""
-    ny_tz = pytz.timezone("America/New_York")
-    return datetime.now(ny_tz).strftime(format_str)
+    return datetime.now(TZ).strftime(format_str)
 
 def extract_status_id(match):
     """Extract status_id from match data, checking multiple locations"""
@@ -940,16 +951,8 @@ def fetch_live_data():
     logger.info("  Raw API status breakdown:")
     
     # Log status breakdown with descriptions
-    status_desc_map = {
-        0: "Abnormal", 1: "Not started", 2: "First half", 3: "Half-time",
-        4: "Second half", 5: "Overtime", 6: "Overtime (deprecated)",
-        7: "Penalty Shoot-out", 8: "End", 9: "Delay", 10: "Interrupt",
-        11: "Cut in half", 12: "Cancel", 13: "To be determined"
-    }
-    
-    for status_id in sorted(status_counts.keys()):
-        count = status_counts[status_id]
-        desc = status_desc_map.get(status_id, f"Unknown Status")
+    for status_id, count in sorted(status_counts.items()):
+        desc = STATUS_DESCRIPTIONS.get(status_id, "Unknown Status")
         logger.info(f"    {desc} (ID: {status_id}): {count} matches")
     
     return live
@@ -974,8 +977,8 @@ def enrich_match_data(live_data, matches):
                 detail = res[0]
         
         # Extract status_id from match details and add it to the main match object
-        if detail.get("status_id") is not None:
-            match["status_id"] = detail.get("status_id")
+        if (status_id := detail.get("status_id")) is not None:
+            match["status_id"] = status_id
     
     # Log completion summary
     detail_end = datetime.now()
@@ -1134,24 +1137,6 @@ def create_unified_status_summary(live_matches_data):
     matches = live_matches_data["results"]
     total_matches = len(matches)
     
-    # Official status mapping
-    status_desc_map = {
-        0: "Abnormal (suggest hiding)",
-        1: "Not started", 
-        2: "First half",
-        3: "Half-time",
-        4: "Second half",
-        5: "Overtime",
-        6: "Overtime (deprecated)",
-        7: "Penalty Shoot-out",
-        8: "End",
-        9: "Delay",
-        10: "Interrupt",
-        11: "Cut in half",
-        12: "Cancel",
-        13: "To be determined"
-    }
-    
     # Count matches by status_id
     status_counts = {}
     matches_with_status = 0
@@ -1160,7 +1145,7 @@ def create_unified_status_summary(live_matches_data):
         status_id = extract_status_id(match)
         if status_id is not None:
             matches_with_status += 1
-            status_desc = status_desc_map.get(status_id, f"Unknown Status")
+            status_desc = OFFICIAL_STATUS_DESCRIPTIONS.get(status_id, "Unknown Status")
             if status_id not in status_counts:
                 status_counts[status_id] = {
                     "description": status_desc,
@@ -1172,8 +1157,7 @@ def create_unified_status_summary(live_matches_data):
     formatted_summary = []
     status_counts_with_ids = {}
     
-    for status_id in sorted(status_counts.keys()):
-        data = status_counts[status_id]
+    for status_id, data in sorted(status_counts.items()):
         description = data["description"]
         count = data["count"]
         
@@ -1210,24 +1194,6 @@ def create_detailed_status_mapping(live_matches_data):
     
     matches = live_matches_data["results"]
     
-    # Official Status ID to description mapping
-    status_desc_map = {
-        0: "Abnormal (suggest hiding)",
-        1: "Not started",
-        2: "First half",
-        3: "Half-time",
-        4: "Second half",
-        5: "Overtime",
-        6: "Overtime (deprecated)",
-        7: "Penalty Shoot-out",
-        8: "End",
-        9: "Delay",
-        10: "Interrupt",
-        11: "Cut in half",
-        12: "Cancel",
-        13: "To be determined"
-    }
-    
     # Group matches by status
     status_groups = {}
     for match in matches:
@@ -1235,7 +1201,7 @@ def create_detailed_status_mapping(live_matches_data):
         status_id = extract_status_id(match)
         
         if status_id is not None:
-            status_desc = status_desc_map.get(status_id, f"Unknown Status (ID: {status_id})")
+            status_desc = OFFICIAL_STATUS_DESCRIPTIONS.get(status_id, f"Unknown Status (ID: {status_id})")
             
             if status_desc not in status_groups:
                 status_groups[status_desc] = {
@@ -1296,14 +1262,6 @@ def create_comprehensive_match_breakdown(all_data):
     match_details = all_data.get("match_details", {})
     team_info = all_data.get("team_info", {})
     
-    # Status mapping
-    status_desc_map = {
-        0: "Abnormal", 1: "Not started", 2: "First half", 3: "Half-time",
-        4: "Second half", 5: "Overtime", 6: "Overtime (deprecated)",
-        7: "Penalty Shoot-out", 8: "End", 9: "Delay", 10: "Interrupt",
-        11: "Cut in half", 12: "Cancel", 13: "To be determined"
-    }
-    
     # Group matches by status with full details
     status_breakdown = {}
     
@@ -1312,7 +1270,7 @@ def create_comprehensive_match_breakdown(all_data):
         status_id = extract_status_id(match)
         
         if status_id is not None:
-            status_desc = status_desc_map.get(status_id, f"Unknown Status (ID: {status_id})")
+            status_desc = STATUS_DESCRIPTIONS.get(status_id, f"Unknown Status (ID: {status_id})")
             
             if status_desc not in status_breakdown:
                 status_breakdown[status_desc] = {
@@ -1398,8 +1356,7 @@ def print_comprehensive_match_breakdown(comprehensive_match_breakdown):
     in_play_statuses = ["First half", "Half-time", "Second half", "Overtime", "Penalty Shoot-out"]
     total_in_play = 0
     
-    for status_desc in sorted(comprehensive_match_breakdown.keys()):
-        status_data = comprehensive_match_breakdown[status_desc]
+    for status_desc, status_data in sorted(comprehensive_match_breakdown.items()):
         status_id = status_data["status_id"]
         count = status_data["count"]
         matches = status_data["matches"]
@@ -1440,7 +1397,7 @@ def continuous_loop():
         try:
             # ─── Step 1a: Fetch live list ─────────────────────────────────────────────
             match_number = get_daily_match_counter()
-            start_time = datetime.now(pytz.timezone("America/New_York"))
+            start_time = datetime.now(TZ)
             logger.info("="*80)
             logger.info(f"STEP 1 – DATA FETCH STARTED – {start_time.strftime('%m/%d/%Y %I:%M:%S %p')} (NYT)")
             logger.info(f"DAILY MATCH #: {match_number}")
@@ -1475,7 +1432,7 @@ def continuous_loop():
             all_data["detailed_status_mapping"] = detailed_status_mapping
             all_data["comprehensive_match_breakdown"] = comprehensive_match_breakdown
 
-            end_time = datetime.now(pytz.timezone("America/New_York"))
+            end_time = datetime.now(TZ)
             total_duration = (end_time - start_time).total_seconds()
             
             # Calculate in-play matches for logging
@@ -1530,8 +1487,7 @@ def continuous_loop():
                 traceback.print_exc()
 
             # Daily rotation file (once per day)
-            ny_tz = pytz.timezone("America/New_York")
-            ny_now = datetime.now(ny_tz)
+            ny_now = datetime.now(TZ)
             daily_filename = f'step1_{ny_now.strftime("%Y-%m-%d")}.json'
             
             if not os.path.exists(daily_filename):
@@ -1608,8 +1564,7 @@ def run_single_cycle():
         update_step2_pipeline_timing(total_pipeline_time)
         
         # Daily rotation file
-        ny_tz = pytz.timezone("America/New_York")
-        ny_now = datetime.now(ny_tz)
+        ny_now = datetime.now(TZ)
         daily_filename = f'step1_{ny_now.strftime("%Y-%m-%d")}.json'
         
         if not os.path.exists(daily_filename):
@@ -1640,23 +1595,25 @@ def update_step2_pipeline_timing(total_pipeline_time: float):
     """
     try:
         step2_file = Path("step2.json")
-        if step2_file.exists():
+        data = None
+        try:
             with open(step2_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            
+        except FileNotFoundError:
+            pass
+        
+        if data is not None:
             # Update the pipeline timing in the summary section
             if "step2_processing_summary" in data:
                 data["step2_processing_summary"]["pipeline_timing"]["total_pipeline_time"] = f"{total_pipeline_time:.2f} seconds"
                 data["step2_processing_summary"]["total_pipeline_time"] = f"{total_pipeline_time:.2f} seconds"
                 
                 # Also update the footer section
-                data["step2_processing_summary"]["completion_status"] = f"COMPLETE PIPELINE (Step 1→7) – FINISHED SUCCESSFULLY – {datetime.now(pytz.timezone('America/New_York')).strftime('%m/%d/%Y %I:%M:%S %p %Z')}"
+                data["step2_processing_summary"]["completion_status"] = f"COMPLETE PIPELINE (Step 1→7) – FINISHED SUCCESSFULLY – {datetime.now(TZ).strftime('%m/%d/%Y %I:%M:%S %p %Z')}"
             
-            # Save updated data
-            with open(step2_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-            logger.info(f"Updated step2.json with complete pipeline timing: {total_pipeline_time:.2f} seconds")
+            # Save updated data (same encoder and format step2 writes with)
+            if step2.save_match_summaries(data, step2_file):
+                logger.info(f"Updated step2.json with complete pipeline timing: {total_pipeline_time:.2f} seconds")
         else:
             logger.warning("step2.json not found, cannot update pipeline timing")
             
@@ -1669,21 +1626,24 @@ def update_step1_pipeline_timing(total_pipeline_time: float):
     """
     try:
         step1_file = Path("step1.json")
-        if step1_file.exists():
+        try:
             with open(step1_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            
+        except FileNotFoundError:
+            data = None
+        
+        if data is not None:
             # Update the pipeline timing in the completion summary section
             if "step1_completion_summary" in data:
                 data["step1_completion_summary"]["total_pipeline_time"] = f"{total_pipeline_time:.2f} seconds"
                 
                 # Update completion status to show full pipeline completion
-                data["step1_completion_summary"]["completion_status"] = f"COMPLETE PIPELINE (Step 1→7) – FINISHED SUCCESSFULLY – {datetime.now(pytz.timezone('America/New_York')).strftime('%m/%d/%Y %I:%M:%S %p %Z')}"
+                data["step1_completion_summary"]["completion_status"] = f"COMPLETE PIPELINE (Step 1→7) – FINISHED SUCCESSFULLY – {datetime.now(TZ).strftime('%m/%d/%Y %I:%M:%S %p %Z')}"
             
             # Also update the step1_detailed_summary if it exists (from centralized logging)
             if "step1_detailed_summary" in data and "completion_summary" in data["step1_detailed_summary"]:
                 data["step1_detailed_summary"]["completion_summary"]["total_pipeline_time"] = f"{total_pipeline_time:.2f}s"
-                data["step1_detailed_summary"]["completion_summary"]["status"] = f"COMPLETE PIPELINE (Step 1→7) – FINISHED SUCCESSFULLY – {datetime.now(pytz.timezone('America/New_York')).strftime('%m/%d/%Y %I:%M:%S %p %Z')}"
+                data["step1_detailed_summary"]["completion_summary"]["status"] = f"COMPLETE PIPELINE (Step 1→7) – FINISHED SUCCESSFULLY – {datetime.now(TZ).strftime('%m/%d/%Y %I:%M:%S %p %Z')}"
             
             # Save updated data
             with open(step1_file, "w", encoding="utf-8") as f:
@@ -1737,29 +1697,10 @@ def create_comprehensive_footer(live_data, all_data, total_duration, match_numbe
     match_details = len(all_data.get("match_details", []))
     match_odds = len(all_data.get("match_odds", []))
     
-    # Status descriptions
-    status_desc_map = {
-        0: "Abnormal (suggest hiding)",
-        1: "Not started",
-        2: "First half",
-        3: "Half-time", 
-        4: "Second half",
-        5: "Overtime",
-        6: "Overtime (deprecated)",
-        7: "Penalty Shoot-out",
-        8: "End",
-        9: "Delay",
-        10: "Interrupt",
-        11: "Cut in half",
-        12: "Cancel",
-        13: "To be determined"
-    }
-    
     # Create status breakdown list
     status_breakdown_list = []
-    for status_id in sorted(status_breakdown.keys()):
-        desc = status_desc_map.get(status_id, f"Unknown Status")
-        count = status_breakdown[status_id]
+    for status_id, count in sorted(status_breakdown.items()):
+        desc = OFFICIAL_STATUS_DESCRIPTIONS.get(status_id, "Unknown Status")
         status_breakdown_list.append(f"{desc} (ID: {status_id}): {count} matches")
     
     # Set completion status based on pipeline state
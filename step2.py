@@ -295,15 +295,58 @@ FILTERING AND SELECTION:
 """
 import json
 import logging
+import mmap
+import os
 from datetime import datetime
-import pytz
+from functools import lru_cache
 import time
 from pathlib import Path
+from zoneinfo import ZoneInfo
+
+# Fastest available JSON backend: orjson, then ujson, then the standard library.
+# _json_dumps returns compact UTF-8 bytes (_json_dumps_pretty: indented by 2);
+# _json_loads accepts bytes or str (and, when _JSON_LOADS_BUFFERS, memoryviews).
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _json_dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+    _JSON_LOADS_BUFFERS = True
+except ImportError:
+    try:
+        import ujson
+
+        def _json_dumps(obj) -> bytes:
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+        def _json_dumps_pretty(obj) -> bytes:
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, indent=2).encode("utf-8")
+
+        _json_loads = ujson.loads
+        _JSONDecodeError = ujson.JSONDecodeError
+        _JSON_LOADS_BUFFERS = False
+    except ImportError:
+        def _json_dumps(obj) -> bytes:
+            return STEP2_ENCODER.encode(obj).encode("utf-8")
+
+        def _json_dumps_pretty(obj) -> bytes:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+        _json_loads = json.loads
+        _JSONDecodeError = json.JSONDecodeError
+        _JSON_LOADS_BUFFERS = False
 
 # Constants
 STEP1_JSON = "/root/6-4-2025/step1.json"
 STEP2_JSON = "/root/6-4-2025/step2.json"
-TZ = pytz.timezone("America/New_York")
+TZ = ZoneInfo("America/New_York")
+TIMESTAMP_FORMAT = "%m/%d/%Y %I:%M:%S %p %Z"
 
 # Betting Company ID to Name mapping
 BETTING_COMPANIES = {
@@ -345,8 +388,39 @@ WEATHER_DESCRIPTIONS = {
     13: "Fog"
 }
 
+# Descriptive odds field name → API field name
+ODDS_FIELD_NAMES = (
+    ("money_line", "eu"),    # European/Money Line odds
+    ("spread", "asia"),      # Asian Handicap/Spread
+    ("over_under", "bs"),    # Ball Size/Over-Under
+    ("corners", "cr"),       # Corner totals
+)
+
 # Preferred order for betting company selection (BET365 first)
-PREFERRED_COMPANIES = ["2", "3", "4", "5", "6", "9", "10", "11", "13", "14", "15", "16", "17", "21", "22"]
+PREFERRED_COMPANIES = ("2", "3", "4", "5", "6", "9", "10", "11", "13", "14", "15", "16", "17", "21", "22")
+
+# Details fields that are applied to the nested team/league objects, not merged as-is
+DETAILS_ID_KEYS = frozenset(("home_team_id", "away_team_id", "competition_id"))
+
+# (company ID, company name) in preference order, resolved once at import
+PREFERRED_COMPANY_TABLE = tuple((company_id, BETTING_COMPANIES[company_id]) for company_id in PREFERRED_COMPANIES)
+
+# step2.json metadata layout with its static fields filled in at import;
+# main() copies it and sets the per-run values.
+METADATA_TEMPLATE = {
+    "total_matches": 0,
+    "timestamp": "",
+    "source": "step2.py",
+}
+
+# Standard-library encoder for step2.json (used when orjson/ujson are missing),
+# built once instead of on every json.dump call. Compact output: no
+# indentation whitespace to write or re-parse downstream.
+STEP2_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# Write buffer for step2.json: the encoder yields many small chunks, which are
+# coalesced into 1 MiB write() calls.
+WRITE_BUFFER_SIZE = 1 << 20
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -354,78 +428,123 @@ logger = logging.getLogger(__name__)
 
 def extract_summary_fields(match: dict) -> dict:
     """Extract key fields from a merged match for summary."""
+    mget = match.get
+    home = mget("home") or {}
+    away = mget("away") or {}
+    league = mget("league") or {}
+    venue = mget("venue")
+    home_scores = mget("home_scores")
+    away_scores = mget("away_scores")
     return {
-        "match_id": match.get("id", ""),
-        "home": match.get("home", {}).get("name", "Unknown"),
-        "away": match.get("away", {}).get("name", "Unknown"),
-        "home_id": match.get("home", {}).get("id", ""),
-        "away_id": match.get("away", {}).get("id", ""),
-        "score": f"{match.get('home_scores', [0])[-1] if match.get('home_scores') else 0}-{match.get('away_scores', [0])[-1] if match.get('away_scores') else 0}",
-        "status_id": match.get("status_id", 0),
-        "competition": match.get("league", {}).get("name", "Unknown"),
-        "competition_id": match.get("league", {}).get("id", ""),
-        "country": match.get("league", {}).get("country_name", "Unknown"),
-        "match_time": match.get("match_time", ""),
-        "kickoff": match.get("kickoff", ""),
-        "venue": match.get("venue", {}).get("name", "") if match.get("venue") else "",
-        "home_position": match.get("home_position", ""),
-        "away_position": match.get("away_position", ""),
+        "match_id": mget("id", ""),
+        "home": home.get("name", "Unknown"),
+        "away": away.get("name", "Unknown"),
+        "home_id": home.get("id", ""),
+        "away_id": away.get("id", ""),
+        "score": f"{home_scores[-1] if home_scores else 0}-{away_scores[-1] if away_scores else 0}",
+        "status_id": mget("status_id", 0),
+        "competition": league.get("name", "Unknown"),
+        "competition_id": league.get("id", ""),
+        "country": league.get("country_name", "Unknown"),
+        "match_time": mget("match_time", ""),
+        "kickoff": mget("kickoff", ""),
+        "venue": venue.get("name", "") if venue else "",
+        "home_position": mget("home_position", ""),
+        "away_position": mget("away_position", ""),
     }
 
-def extract_odds(match: dict) -> dict:
-    """Extract odds data from match, mapping API field names to descriptive names."""
-    odds_data = {}
-    if "odds" in match and isinstance(match["odds"], dict):
-        # Odds are organized by company ID
-        for company_id, company_odds in match["odds"].items():
-            if isinstance(company_odds, dict):
-                # Map old field names to new descriptive names
-                odds_data[company_id] = {
-                    "money_line": company_odds.get("eu", []),      # European/Money Line odds
-                    "spread": company_odds.get("asia", []),        # Asian Handicap/Spread
-                    "over_under": company_odds.get("bs", []),      # Ball Size/Over-Under
-                    "corners": company_odds.get("cr", [])          # Corner totals
-                }
-    return odds_data
+def extract_company_odds(company_odds: dict) -> dict:
+    """Map one company's API odds field names to descriptive names."""
+    get = company_odds.get
+    return {name: get(api_name, []) for name, api_name in ODDS_FIELD_NAMES}
+
+def select_company_odds(odds_results) -> tuple:
+    """
+    Pick the first preferred company (BET365 first) that has money line,
+    spread or over/under data in a match's {company ID: API odds} dict.
+
+    Returns (company_id, company_name, company_odds), or (None, None, None).
+    """
+    if odds_results:
+        try:
+            get_company_odds = odds_results.get
+        except AttributeError:
+            # Odds not in the {company ID: {...}} object shape
+            return None, None, None
+        for company_id, company_name in PREFERRED_COMPANY_TABLE:
+            company_odds = get_company_odds(company_id)
+            if company_odds:
+                try:
+                    if company_odds.get("eu") or company_odds.get("asia") or company_odds.get("bs"):
+                        return company_id, company_name, company_odds
+                except AttributeError:
+                    # Malformed company entry: skip it, keep looking
+                    continue
+    return None, None, None
+
+def convert_temperature_to_fahrenheit(temperature_str) -> str:
+    """Convert a Celsius reading such as "30°C" to "86.0°F" ("" if it can't be parsed)."""
+    if temperature_str and "°C" in temperature_str:
+        try:
+            # Extract numeric value (e.g., "30°C" -> 30)
+            temp_celsius = float(temperature_str.replace("°C", "").strip())
+            temp_fahrenheit = (temp_celsius * 9/5) + 32
+            return f"{temp_fahrenheit:.1f}°F"
+        except (ValueError, AttributeError):
+            pass
+    return ""
+
+def convert_wind_to_mph(wind_str) -> str:
+    """Convert a wind reading such as "7.0m/s" to "15.7mph" ("" if it can't be parsed)."""
+    if wind_str and "m/s" in wind_str:
+        try:
+            # Extract numeric value (e.g., "7.0m/s" -> 7.0)
+            wind_ms = float(wind_str.replace("m/s", "").strip())
+            wind_mph_value = wind_ms * 2.237
+            return f"{wind_mph_value:.1f}mph"
+        except (ValueError, AttributeError):
+            pass
+    return ""
+
+# Precomputed conversions for the readings the API sends (whole-degree
+# temperatures, wind speeds in 0.1 m/s steps); anything else is computed.
+TEMPERATURE_F_TABLE = {
+    f"{c}°C": convert_temperature_to_fahrenheit(f"{c}°C") for c in range(-40, 60)
+}
+WIND_MPH_TABLE = {
+    f"{t / 10:.1f}m/s": convert_wind_to_mph(f"{t / 10:.1f}m/s") for t in range(0, 401)
+}
+
+# Weather descriptions keyed by both int and str IDs, so the common case skips int()
+WEATHER_LOOKUP = {**WEATHER_DESCRIPTIONS, **{str(k): v for k, v in WEATHER_DESCRIPTIONS.items()}}
 
 def extract_environment(match: dict) -> dict:
     """Extract environment/weather data from match with temperature and wind conversions."""
     env = match.get("environment", {})
     if isinstance(env, dict):
+        env_get = env.get
         # Extract raw values
-        temperature_str = env.get("temperature", "")
-        wind_str = env.get("wind", "")  # Field is "wind" not "wind_speed" in the data
-        
-        # Initialize converted values
-        temperature_fahrenheit = ""
-        wind_mph = ""
+        temperature_str = env_get("temperature", "")
+        wind_str = env_get("wind", "")  # Field is "wind" not "wind_speed" in the data
         
         # Convert temperature from Celsius to Fahrenheit
-        if temperature_str and "°C" in temperature_str:
-            try:
-                # Extract numeric value (e.g., "30°C" -> 30)
-                temp_celsius = float(temperature_str.replace("°C", "").strip())
-                temp_fahrenheit = (temp_celsius * 9/5) + 32
-                temperature_fahrenheit = f"{temp_fahrenheit:.1f}°F"
-            except (ValueError, AttributeError):
-                temperature_fahrenheit = ""
+        temperature_fahrenheit = TEMPERATURE_F_TABLE.get(temperature_str) if isinstance(temperature_str, str) else None
+        if temperature_fahrenheit is None:
+            temperature_fahrenheit = convert_temperature_to_fahrenheit(temperature_str)
         
         # Convert wind speed from m/s to mph
-        if wind_str and "m/s" in wind_str:
-            try:
-                # Extract numeric value (e.g., "7.0m/s" -> 7.0)
-                wind_ms = float(wind_str.replace("m/s", "").strip())
-                wind_mph_value = wind_ms * 2.237
-                wind_mph = f"{wind_mph_value:.1f}mph"
-            except (ValueError, AttributeError):
-                wind_mph = ""
+        wind_mph = WIND_MPH_TABLE.get(wind_str) if isinstance(wind_str, str) else None
+        if wind_mph is None:
+            wind_mph = convert_wind_to_mph(wind_str)
         
         # Convert weather ID to description
-        weather_id = env.get("weather", "")
+        weather_id = env_get("weather", "")
         weather_description = ""
         if weather_id:
             try:
-                weather_description = WEATHER_DESCRIPTIONS.get(int(weather_id), f"Unknown weather ID: {weather_id}")
+                weather_description = WEATHER_LOOKUP.get(weather_id)
+                if weather_description is None:
+                    weather_description = WEATHER_DESCRIPTIONS.get(int(weather_id), f"Unknown weather ID: {weather_id}")
             except (ValueError, TypeError):
                 weather_description = f"Invalid weather ID: {weather_id}"
         
@@ -434,10 +553,10 @@ def extract_environment(match: dict) -> dict:
             "weather_description": weather_description,
             "temperature": temperature_str,
             "temperature_fahrenheit": temperature_fahrenheit,
-            "humidity": env.get("humidity", ""),
+            "humidity": env_get("humidity", ""),
             "wind_speed": wind_str,
             "wind_speed_mph": wind_mph,
-            "pressure": env.get("pressure", "")
+            "pressure": env_get("pressure", "")
         }
     return {}
 
@@ -445,38 +564,74 @@ def extract_events(match: dict) -> list:
     """Extract match events if available."""
     return match.get("events", [])
 
+@lru_cache(maxsize=4096)
+def _decimal_to_american(d: float):
+    """Memoized core of convert_decimal_to_american (the same prices recur across matches)."""
+    if d >= 2.00:
+        # Positive American odds
+        return int(round((d - 1) * 100))
+    elif d >= 1.00:
+        # Negative American odds
+        return int(round(-100 / (d - 1)))
+    else:
+        # Invalid decimal odd (should be >= 1.00)
+        return None
+
+@lru_cache(maxsize=4096)
+def _hong_kong_to_american(h: float):
+    """Memoized core of convert_hong_kong_to_american."""
+    if h >= 1.00:
+        # Positive American odds
+        return int(round(h * 100))
+    elif h > 0:
+        # Negative American odds
+        return int(round(-100 / h))
+    else:
+        # Invalid HK odd (should be > 0)
+        return None
+
 def convert_decimal_to_american(decimal_odd):
     """Convert decimal odds to American odds format."""
     try:
-        d = float(decimal_odd)
-        if d >= 2.00:
-            # Positive American odds
-            return int(round((d - 1) * 100))
-        elif d >= 1.00:
-            # Negative American odds
-            return int(round(-100 / (d - 1)))
-        else:
-            # Invalid decimal odd (should be >= 1.00)
-            return None
+        return _decimal_to_american(float(decimal_odd))
     except (ValueError, TypeError, ZeroDivisionError):
         return None
 
 def convert_hong_kong_to_american(hk_odd):
     """Convert Hong Kong odds to American odds format."""
     try:
-        h = float(hk_odd)
-        if h >= 1.00:
-            # Positive American odds
-            return int(round(h * 100))
-        elif h > 0:
-            # Negative American odds
-            return int(round(-100 / h))
-        else:
-            # Invalid HK odd (should be > 0)
-            return None
+        return _hong_kong_to_american(float(hk_odd))
     except (ValueError, TypeError, ZeroDivisionError):
         return None
 
+def _convert_decimal_values(val1, val2, val3):
+    """Money Line: all three values are decimal odds."""
+    return (convert_decimal_to_american(val1),
+            convert_decimal_to_american(val2),
+            convert_decimal_to_american(val3))
+
+def _convert_hong_kong_values(val1, val2, val3):
+    """Spread, Over/Under, Corners: val2 is the handicap/total line, not an odd."""
+    return (convert_hong_kong_to_american(val1),
+            val2,
+            convert_hong_kong_to_american(val3))
+
+# Odds type → value converter (anything not listed uses Hong Kong odds)
+ODDS_VALUE_CONVERTERS = {
+    "money_line": _convert_decimal_values,
+}
+
+def format_american(value, is_middle_value=False, is_money_line=False):
+    """Format an American odd with its sign; non-money-line middle values are lines, kept numeric."""
+    if value is None:
+        return value
+    # For spread/over-under/corners, the middle value is the line, not odds
+    if is_middle_value and not is_money_line:
+        return value  # Keep handicap/line as numeric
+    if isinstance(value, (int, float)):
+        return f"+{int(value)}" if value > 0 else str(int(value))
+    return value
+
 def convert_odds_array(odds_array, odds_type):
     """
     Convert an odds array to include American odds format.
@@ -490,59 +645,50 @@ def convert_odds_array(odds_array, odds_type):
         Tuple of (original_array, american_array)
     """
     american_arrays = []
+    convert_values = ODDS_VALUE_CONVERTERS.get(odds_type, _convert_hong_kong_values)
+    is_money_line = odds_type == "money_line"
+    # Local aliases for the per-entry loop
+    fmt = format_american
+    append = american_arrays.append
     
     for odds_entry in odds_array:
-        if len(odds_entry) >= 8:
-            # Extract the original values
-            timestamp = odds_entry[0]
-            minute = odds_entry[1]
-            val1 = odds_entry[2]
-            val2 = odds_entry[3]
-            val3 = odds_entry[4]
-            status = odds_entry[5]
-            sealed = odds_entry[6]
-            score = odds_entry[7]
-            
-            # Convert based on odds type
-            if odds_type == "money_line":
-                # Money Line uses decimal odds
-                american1 = convert_decimal_to_american(val1)
-                american2 = convert_decimal_to_american(val2)
-                american3 = convert_decimal_to_american(val3)
-            else:
-                # Spread, Over/Under, Corners use Hong Kong odds
-                american1 = convert_hong_kong_to_american(val1)
-                american3 = convert_hong_kong_to_american(val3)
-                # val2 is the handicap/total line, not an odd
-                american2 = val2
-            
-            # Format American odds with proper sign
-            def format_american(value, is_middle_value=False):
-                if value is None:
-                    return value
-                # For spread/over-under/corners, the middle value is the line, not odds
-                if is_middle_value and odds_type != "money_line":
-                    return value  # Keep handicap/line as numeric
-                if isinstance(value, (int, float)):
-                    return f"+{int(value)}" if value > 0 else str(int(value))
-                return value
-            
-            # Create American odds array
-            american_entry = [
-                timestamp,
-                minute,
-                format_american(american1),
-                format_american(american2, is_middle_value=True),
-                format_american(american3),
-                status,
-                sealed,
-                score
-            ]
-            american_arrays.append(american_entry)
+        # Extract the original values (rows shorter than 8 fields are skipped)
+        try:
+            timestamp, minute, val1, val2, val3, status, sealed, score, *_ = odds_entry
+        except ValueError:
+            continue
+        
+        # Convert based on odds type
+        american1, american2, american3 = convert_values(val1, val2, val3)
+        
+        # Create American odds array
+        american_entry = [
+            timestamp,
+            minute,
+            fmt(american1),
+            fmt(american2, True, is_money_line),
+            fmt(american3),
+            status,
+            sealed,
+            score
+        ]
+        append(american_entry)
     
     return odds_array, american_arrays
 
-def filter_odds_by_minutes(odds_data, min_minute=2, max_minute=6):
+# Minute field strings as sent by the API → int, so the common case skips int()
+MINUTE_VALUES = {str(minute): minute for minute in range(0, 151)}
+
+# Odds types kept by filter_odds_by_minutes and the default minute window
+FILTERED_ODDS_TYPES = ("money_line", "spread", "over_under", "corners")
+ODDS_MIN_MINUTE = 2
+ODDS_MAX_MINUTE = 6
+
+# Windows up to this many minutes keep one list slot per minute; wider
+# windows use a dict so memory follows the number of entries, not the width
+MAX_WINDOW_SLOTS = 32
+
+def filter_odds_by_minutes(odds_data, min_minute=ODDS_MIN_MINUTE, max_minute=ODDS_MAX_MINUTE):
     """
     Filter odds arrays to only keep entries where the minute field (second field) 
     is between min_minute and max_minute (inclusive).
@@ -557,286 +703,343 @@ def filter_odds_by_minutes(odds_data, min_minute=2, max_minute=6):
         Filtered odds data
     """
     filtered_odds = {}
+    minute_value = MINUTE_VALUES.get  # local alias for the per-entry loop
+    window_size = max_minute - min_minute + 1
+    use_slots = window_size <= MAX_WINDOW_SLOTS
     
-    for odds_type in ['money_line', 'spread', 'over_under', 'corners']:
-        if odds_type in odds_data:
-            # First, collect all valid entries grouped by minute
-            minute_entries = {}
+    for odds_type in FILTERED_ODDS_TYPES:
+        arrays = odds_data.get(odds_type)
+        if arrays is not None:
+            # Keep the latest entry (highest timestamp) per minute in a single
+            # pass, keyed by minute - min_minute
+            latest_by_minute = [None] * window_size if use_slots else {}
             
-            for array in odds_data[odds_type]:
+            for array in arrays:
                 # Check if the array has at least 2 elements and the second element is the minute field
                 if len(array) >= 2:
                     minute_field = array[1]  # Get the minute field
                     
                     # Convert to integer for numeric comparison
                     try:
-                        minute_num = int(minute_field) if minute_field != "" else -1
-                        
-                        # Only keep if minute field is between min and max (inclusive)
-                        if min_minute <= minute_num <= max_minute:
-                            # Group by minute, keeping track of timestamp
-                            if minute_num not in minute_entries:
-                                minute_entries[minute_num] = []
-                            minute_entries[minute_num].append(array)
+                        minute_num = minute_field if type(minute_field) is int else minute_value(minute_field)
+                        if minute_num is None:
+                            minute_num = int(minute_field) if minute_field != "" else -1
                     except (ValueError, TypeError):
                         # Skip entries that can't be converted to int
-                        pass
-            
-            # Now keep only the last entry (highest timestamp) for each minute
-            filtered_arrays = []
-            for minute in sorted(minute_entries.keys()):
-                # Sort by timestamp (first element) and take the last one
-                entries_for_minute = sorted(minute_entries[minute], key=lambda x: x[0])
-                filtered_arrays.append(entries_for_minute[-1])  # Take the last (highest timestamp)
+                        continue
+                    
+                    # Only keep if minute field is between min and max (inclusive)
+                    slot = minute_num - min_minute
+                    if 0 <= slot < window_size:
+                        current = latest_by_minute[slot] if use_slots else latest_by_minute.get(slot)
+                        # ">=" so the later entry wins on equal timestamps
+                        if current is None or array[0] >= current[0]:
+                            latest_by_minute[slot] = array
             
-            filtered_odds[odds_type] = filtered_arrays
+            if use_slots:
+                filtered_odds[odds_type] = [array for array in latest_by_minute if array is not None]
+            else:
+                filtered_odds[odds_type] = [latest_by_minute[slot] for slot in sorted(latest_by_minute)]
     
     return filtered_odds
 
-def merge_and_summarize(live_matches: list, match_details: dict, match_odds: dict, 
-                        team_info: dict, competition_info: dict, countries: dict) -> list:
-    """Merge live match data with enriched data from other endpoints."""
-    summaries = []
-    
-    for match in live_matches:
-        match_id = str(match.get("id", ""))
-        if not match_id:
-            continue
-            
-        # Get details for this match
-        details_wrapper = match_details.get(match_id, {})
-        details = None
-        if isinstance(details_wrapper, dict) and "results" in details_wrapper:
-            results = details_wrapper.get("results", [])
-            if results and isinstance(results, list) and len(results) > 0:
-                details = results[0]
-        
-        # Initialize match structure if needed
-        if not match.get("home"):
-            match["home"] = {}
-        if not match.get("away"):
-            match["away"] = {}
-        if not match.get("league"):
-            match["league"] = {}
-        
-        # Merge details into match (including team IDs)
-        if details:
-            # Set team IDs
-            home_team_id = details.get("home_team_id", "")
-            away_team_id = details.get("away_team_id", "")
-            competition_id = details.get("competition_id", "")
-            
-            if home_team_id:
-                match["home"]["id"] = home_team_id
-            if away_team_id:
-                match["away"]["id"] = away_team_id
-            if competition_id:
-                match["league"]["id"] = competition_id
-            
-            # Add status_id if not present
-            if "status_id" not in match and "status_id" in details:
-                match["status_id"] = details["status_id"]
-                
-            # Merge other fields from details
-            for key, value in details.items():
-                if key not in ["home_team_id", "away_team_id", "competition_id"] and key not in match:
-                    match[key] = value
-        
-        # Get odds data
-        odds_wrapper = match_odds.get(match_id, {})
-        if isinstance(odds_wrapper, dict) and "results" in odds_wrapper:
-            odds_results = odds_wrapper.get("results", {})
-            # Check if results is a dictionary (actual format) not a list
-            if isinstance(odds_results, dict) and odds_results:
-                match["odds"] = odds_results
-            else:
-                match["odds"] = {}
-        
-        # Get team names using team IDs
-        home_team_id = str(match.get("home", {}).get("id", "") or details.get("home_team_id", ""))
-        away_team_id = str(match.get("away", {}).get("id", "") or details.get("away_team_id", ""))
-        
-        # Lookup home team
-        if home_team_id and home_team_id in team_info:
-            team_wrapper = team_info[home_team_id]
-            if isinstance(team_wrapper, dict) and "results" in team_wrapper:
-                team_results = team_wrapper.get("results", [])
-                if team_results and isinstance(team_results, list) and len(team_results) > 0:
-                    team_data = team_results[0]
-                    match["home"]["name"] = team_data.get("name", "Unknown")
-                    match["home"]["short_name"] = team_data.get("short_name", "")
-                    match["home"]["logo"] = team_data.get("logo", "")
-        
-        # Lookup away team
-        if away_team_id and away_team_id in team_info:
-            team_wrapper = team_info[away_team_id]
-            if isinstance(team_wrapper, dict) and "results" in team_wrapper:
-                team_results = team_wrapper.get("results", [])
-                if team_results and isinstance(team_results, list) and len(team_results) > 0:
-                    team_data = team_results[0]
-                    match["away"]["name"] = team_data.get("name", "Unknown")
-                    match["away"]["short_name"] = team_data.get("short_name", "")
-                    match["away"]["logo"] = team_data.get("logo", "")
-        
-        # Get competition info
-        comp_id = str(match.get("league", {}).get("id", "") or details.get("competition_id", ""))
-        country_name = "Unknown"
-        if comp_id and comp_id in competition_info:
-            comp_wrapper = competition_info[comp_id]
-            if isinstance(comp_wrapper, dict) and "results" in comp_wrapper:
-                comp_results = comp_wrapper.get("results", [])
-                if comp_results and isinstance(comp_results, list) and len(comp_results) > 0:
-                    comp_data = comp_results[0]
-                    match["league"]["name"] = comp_data.get("name", "Unknown")
-                    match["league"]["short_name"] = comp_data.get("short_name", "")
-                    match["league"]["logo"] = comp_data.get("logo", "")
-                    
-                    # Get country ID from competition and look up country name
-                    country_id = comp_data.get("country_id", "")
-                    if country_id and countries:
-                        # Check if countries has the country data
-                        if country_id in countries:
-                            country_data = countries[country_id]
-                            if isinstance(country_data, dict):
-                                # Direct country object format
-                                country_name = country_data.get("name", "Unknown")
-                    
-                    match["league"]["country_name"] = country_name
-                    match["league"]["country_code"] = ""
-        
-        # Extract summary fields
-        summary = extract_summary_fields(match)
-        summary["status"] = match.get("status_id", 0)
-        
-        # Extract and filter odds - select only one betting company
-        raw_odds = extract_odds(match)
-        selected_company_id = None
-        selected_odds = {}
+def _first_result(wrapper):
+    """Unwrap an API response of the form {"results": [obj, ...]} to obj (or None)."""
+    if isinstance(wrapper, dict):
+        results = wrapper.get("results")
+        if isinstance(results, list) and results:
+            return results[0]
+    return None
+
+def _id_str(value) -> str:
+    """Normalize an API ID to the string form used for lookup keys ("" if missing)."""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+def flatten_results(table: dict) -> dict:
+    """Map each ID (as a string) in an endpoint table to the first object of its "results" list."""
+    flat = {}
+    for key, wrapper in table.items():
+        result = _first_result(wrapper)
+        if result is not None:
+            flat[_id_str(key)] = result
+    return flat
+
+def flatten_odds(match_odds: dict) -> dict:
+    """Map each match ID to its selected company as returned by select_company_odds().
+
+    Only one company's odds ever reach the summary, so the company is picked
+    here, once per match, and the other companies are not carried further.
+    """
+    flat = {}
+    for key, wrapper in match_odds.items():
+        if isinstance(wrapper, dict) and "results" in wrapper:
+            flat[_id_str(key)] = select_company_odds(wrapper["results"])
+    return flat
+
+def summarize_match(match: dict, details_by_id: dict, odds_by_id: dict,
+                    teams: dict, competitions: dict, country_names: dict) -> dict:
+    """Merge one live match with its enriched data and build its summary.
+
+    details_by_id, teams and competitions are ID → object lookups from
+    flatten_results(); odds_by_id maps match ID → selected company from
+    flatten_odds(); country_names maps country ID → name.
+    Returns None for matches without an ID.
+    """
+    match_id = _id_str(match.get("id"))
+    if not match_id:
+        return None
         
-        # Try to find BET365 first, then fall back to preferred order
-        for company_id in PREFERRED_COMPANIES:
-            if company_id in raw_odds and raw_odds[company_id]:
-                # Check if this company has any odds data
-                has_data = False
-                for odds_type in ['money_line', 'spread', 'over_under']:
-                    if raw_odds[company_id].get(odds_type):
-                        has_data = True
-                        break
-                
-                if has_data:
-                    selected_company_id = company_id
-                    selected_odds = filter_odds_by_minutes(raw_odds[company_id])
-                    break
+    # Get details for this match
+    details = details_by_id.get(match_id)
+    
+    # Merge into a fresh dict so the input match is left untouched:
+    # live match fields win, details only fill in missing fields
+    merged = dict(match)
+    if details:
+        for key in details.keys() - DETAILS_ID_KEYS - match.keys():
+            merged[key] = details[key]
+    
+    # Copy the nested objects that get enriched below
+    home = merged["home"] = dict(match.get("home") or {})
+    away = merged["away"] = dict(match.get("away") or {})
+    league = merged["league"] = dict(match.get("league") or {})
+    
+    # Set team IDs from details
+    if details:
+        home_team_id = details.get("home_team_id", "")
+        away_team_id = details.get("away_team_id", "")
+        competition_id = details.get("competition_id", "")
         
-        # Set the selected odds and company info
-        if selected_company_id:
-            # PRIORITIZED: Descriptive field names at the top level come FIRST
-            summary["money_line"], summary["money_line_american"] = convert_odds_array(selected_odds.get("money_line", []), "money_line")
-            summary["spread"], summary["spread_american"] = convert_odds_array(selected_odds.get("spread", []), "spread")
-            summary["over_under"], summary["over_under_american"] = convert_odds_array(selected_odds.get("over_under", []), "over_under")
-            summary["corners"], summary["corners_american"] = convert_odds_array(selected_odds.get("corners", []), "corners")
-            summary["odds_company_id"] = selected_company_id
-            summary["odds_company_name"] = BETTING_COMPANIES.get(selected_company_id, f"Company {selected_company_id}")
-            
-            # Keep the original odds structure with selected company only (AFTER new fields)
-            summary["odds"] = {selected_company_id: selected_odds}
-        else:
-            summary["money_line"] = []
-            summary["money_line_american"] = []
-            summary["spread"] = []
-            summary["spread_american"] = []
-            summary["over_under"] = []
-            summary["over_under_american"] = []
-            summary["corners"] = []
-            summary["corners_american"] = []
-            summary["odds_company_id"] = None
-            summary["odds_company_name"] = None
-            summary["odds"] = {}
+        if home_team_id:
+            home["id"] = home_team_id
+        if away_team_id:
+            away["id"] = away_team_id
+        if competition_id:
+            league["id"] = competition_id
+    
+    # Get team names using team IDs (details IDs were already merged above)
+    home_team_id = _id_str(home.get("id"))
+    away_team_id = _id_str(away.get("id"))
+    
+    # Lookup home team
+    team_data = teams.get(home_team_id)
+    if team_data is not None:
+        home["name"] = team_data.get("name", "Unknown")
+        home["short_name"] = team_data.get("short_name", "")
+        home["logo"] = team_data.get("logo", "")
+    
+    # Lookup away team
+    team_data = teams.get(away_team_id)
+    if team_data is not None:
+        away["name"] = team_data.get("name", "Unknown")
+        away["short_name"] = team_data.get("short_name", "")
+        away["logo"] = team_data.get("logo", "")
+    
+    # Get competition info
+    comp_id = _id_str(league.get("id"))
+    country_name = "Unknown"
+    comp_data = competitions.get(comp_id)
+    if comp_data is not None:
+        league["name"] = comp_data.get("name", "Unknown")
+        league["short_name"] = comp_data.get("short_name", "")
+        league["logo"] = comp_data.get("logo", "")
         
-        summary["environment"] = extract_environment(match)
-        summary["events"] = extract_events(match)
+        # Get country ID from competition and look up country name
+        country_id = comp_data.get("country_id", "")
+        if country_id:
+            country_name = country_names.get(country_id, "Unknown")
         
-        summaries.append(summary)
+        league["country_name"] = country_name
+        league["country_code"] = ""
+    
+    # Use the betting company (BET365 first, then preferred order) selected
+    # when the odds were flattened, falling back to odds on the match itself,
+    # and rename/filter just that company's odds
+    selection = odds_by_id.get(match_id)
+    if selection is None:
+        selection = select_company_odds(merged.get("odds"))
+    selected_company_id, selected_company_name, company_odds = selection
+    selected_odds = filter_odds_by_minutes(extract_company_odds(company_odds)) if selected_company_id else {}
+    
+    # Convert the selected odds (all empty when no company was selected)
+    money_line, money_line_american = convert_odds_array(selected_odds.get("money_line", []), "money_line")
+    spread, spread_american = convert_odds_array(selected_odds.get("spread", []), "spread")
+    over_under, over_under_american = convert_odds_array(selected_odds.get("over_under", []), "over_under")
+    corners, corners_american = convert_odds_array(selected_odds.get("corners", []), "corners")
     
+    # Build the summary in one literal: summary fields, then the
+    # PRIORITIZED descriptive odds fields, then the original odds structure
+    # with the selected company only (AFTER new fields)
+    return {
+        **extract_summary_fields(merged),
+        "status": merged.get("status_id", 0),
+        "money_line": money_line,
+        "money_line_american": money_line_american,
+        "spread": spread,
+        "spread_american": spread_american,
+        "over_under": over_under,
+        "over_under_american": over_under_american,
+        "corners": corners,
+        "corners_american": corners_american,
+        "odds_company_id": selected_company_id,
+        "odds_company_name": selected_company_name,
+        "odds": {selected_company_id: selected_odds} if selected_company_id else {},
+        "environment": extract_environment(merged),
+        "events": extract_events(merged),
+    }
+
+def merge_and_summarize(live_matches: list, match_details: dict, match_odds: dict, 
+                        team_info: dict, competition_info: dict, country_names: dict) -> list:
+    """Merge live match data with enriched data from other endpoints."""
+    # Unwrap the {"results": ...} responses once, not per match
+    details_by_id = flatten_results(match_details)
+    odds_by_id = flatten_odds(match_odds)
+    teams = flatten_results(team_info)
+    competitions = flatten_results(competition_info)
+
+    summaries = []
+    for match in live_matches:
+        summary = summarize_match(match, details_by_id, odds_by_id,
+                                  teams, competitions, country_names)
+        if summary is not None:
+            summaries.append(summary)
     return summaries
 
-def save_match_summaries(data: dict, output_file: str) -> bool:
-    """Save the processed match summaries to JSON file."""
+def _iter_step2_output(data: dict):
+    """
+    Encode the step2.json payload key by key, and the summaries list one
+    summary at a time, yielding byte chunks so the file is written piecewise
+    instead of from one encoded copy of the whole payload.
+    """
+    separator = b"{"
+    for key, value in data.items():
+        yield separator + _json_dumps(key) + b":"
+        separator = b","
+        if key != "summaries":
+            yield _json_dumps(value)
+            continue
+        yield b"["
+        item_separator = b""
+        for summary in value:
+            yield item_separator + _json_dumps(summary)
+            item_separator = b","
+        yield b"]"
+    yield b"}" if separator == b"," else b"{}"
+
+def save_match_summaries(data: dict, output_file: str, pretty: bool = False) -> bool:
+    """Save the processed match summaries to JSON file.
+
+    Output is compact unless pretty is set (2-space indent, for reading by
+    hand). The payload goes to a temporary file that then replaces
+    output_file, so readers never see a partially written step2.json.
+    """
+    temp_file = f"{output_file}.tmp"
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(temp_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            if pretty:
+                f.write(_json_dumps_pretty(data))
+            else:
+                f.writelines(_iter_step2_output(data))
+        os.replace(temp_file, output_file)
         return True
     except Exception as e:
         logger.error(f"Failed to save to {output_file}: {e}")
+        # Don't leave a partial temporary file behind
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
         return False
 
-def main():
-    """Main entry point"""
+def load_json_file(path) -> dict:
+    """Parse a JSON file. With orjson the file is memory-mapped and parsed in
+    place instead of being copied into a bytes object first."""
+    with open(path, 'rb') as f:
+        if _JSON_LOADS_BUFFERS:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped; let the parser report them
+                return _json_loads(f.read())
+            with mapped, memoryview(mapped) as view:
+                return _json_loads(view)
+        return _json_loads(f.read())
+
+def main(pretty: bool = False):
+    """Main entry point (pretty: write indented step2.json)"""
     logger.info("Step 2 processing started...")
     
     # Track processing time
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         # Load step1.json
         logger.info(f"Loading {STEP1_JSON}...")
-        with open(STEP1_JSON, 'r', encoding='utf-8') as f:
-            step1_data = json.load(f)
+        step1_data = load_json_file(STEP1_JSON)
         
-        # Extract live matches and payload data
-        live_matches = step1_data.get("live_matches", {})
-        payload_data = {k: v for k, v in step1_data.items() if k != "live_matches"}
+        # Extract live matches and the enrichment tables
+        live_results = step1_data.get("live_matches", {}).get("results", [])
+        match_details = step1_data.get("match_details", {})
+        match_odds = step1_data.get("match_odds", {})
+        team_info = step1_data.get("team_info", {})
+        competition_info = step1_data.get("competition_info", {})
+        countries_data = step1_data.get("countries", {})
+        del step1_data
         
-        # Build country lookup dictionary
-        countries_data = payload_data.get("countries", {})
-        country_lookup = {}
-        for key, value in countries_data.items():
+        # Build country ID → name lookup (only the name is used downstream)
+        country_names = {}
+        for value in countries_data.values():
             if isinstance(value, list):
                 for country in value:
                     if isinstance(country, dict) and "id" in country:
-                        country_lookup[country["id"]] = country
+                        country_names[country["id"]] = country.get("name", "Unknown")
         
-        logger.info(f"Found {len(live_matches.get('results', []))} live matches")
-        logger.info(f"Found {len(payload_data.get('team_info', {}))} teams")
-        logger.info(f"Found {len(payload_data.get('competition_info', {}))} competitions")
-        logger.info(f"Found {len(country_lookup)} countries")
+        logger.info(f"Found {len(live_results)} live matches")
+        logger.info(f"Found {len(team_info)} teams")
+        logger.info(f"Found {len(competition_info)} competitions")
+        logger.info(f"Found {len(country_names)} countries")
         
         # Merge and summarize
         logger.info("Merging and summarizing match data...")
+        metadata = METADATA_TEMPLATE.copy()
+        metadata["total_matches"] = len(live_results)
+        now = datetime.now(TZ)
+        metadata["timestamp"] = now.isoformat()
+        summaries = merge_and_summarize(live_results, match_details, match_odds,
+                                        team_info, competition_info, country_names)
+        
+        # The summaries hold everything that is written out; release the
+        # parsed step1 tables before encoding so both are not live at once
+        del live_results, match_details, match_odds, team_info, competition_info, countries_data
+        
         merged_data = {
-            "summaries": merge_and_summarize(live_matches.get("results", []), 
-                                              payload_data.get("match_details", {}), 
-                                              payload_data.get("match_odds", {}), 
-                                              payload_data.get("team_info", {}), 
-                                              payload_data.get("competition_info", {}), 
-                                              country_lookup),
-            "metadata": {
-                "total_matches": len(live_matches.get("results", [])),
-                "timestamp": datetime.now(TZ).isoformat(),
-                "source": "step2.py"
-            }
+            "summaries": summaries,
+            "metadata": metadata
         }
         
         # Add processing time
-        processing_time = time.time() - start_time
-        merged_data["metadata"]["processing_time"] = f"{processing_time:.2f} seconds"
+        processing_time = time.perf_counter() - start_time
+        processing_time_str = f"{processing_time:.2f} seconds"
+        merged_data["metadata"]["processing_time"] = processing_time_str
         
         # Add step2 processing summary
         merged_data["step2_processing_summary"] = {
-            "processed_at": datetime.now(TZ).strftime("%m/%d/%Y %I:%M:%S %p %Z"),
+            "processed_at": now.strftime(TIMESTAMP_FORMAT),
             "input_file": STEP1_JSON,
             "output_file": STEP2_JSON,
             "total_matches_processed": len(merged_data["summaries"]),
-            "processing_time": f"{processing_time:.2f} seconds",
+            "processing_time": processing_time_str,
             "pipeline_timing": {
-                "step2_start": datetime.now(TZ).isoformat(),
-                "step2_duration": f"{processing_time:.2f} seconds"
+                "step2_start": metadata["timestamp"],
+                "step2_duration": processing_time_str
             }
         }
         
         # Save to step2.json
         logger.info(f"Saving {len(merged_data['summaries'])} match summaries to {STEP2_JSON}...")
-        success = save_match_summaries(merged_data, STEP2_JSON)
+        success = save_match_summaries(merged_data, STEP2_JSON, pretty=pretty)
         
         if success:
             logger.info(f"Step 2 completed successfully in {processing_time:.2f} seconds")
@@ -846,11 +1049,17 @@ def main():
             
     except FileNotFoundError:
         logger.error(f"Could not find {STEP1_JSON}. Please run step1.py first.")
-    except json.JSONDecodeError as e:
+    except _JSONDecodeError as e:
         logger.error(f"Invalid JSON in {STEP1_JSON}: {e}")
     except Exception as e:
         logger.error(f"Unexpected error in Step 2: {e}")
         raise
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Step 2 - merge and summarize live match data')
+    parser.add_argument('--pretty', action='store_true',
+                       help='Write step2.json indented for reading (default: compact)')
+    args = parser.parse_args()
+    main(pretty=args.pretty)
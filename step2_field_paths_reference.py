@@ -131,7 +131,7 @@ def extract_summary_fields_paths():
     }
 
 def extract_odds_paths():
-    """Shows how extract_odds maps API fields to our names"""
+    """Shows how extract_company_odds maps API fields to our names"""
     return {
         "input": "match['odds'][company_id]",
         "output": {
@@ -194,7 +194,7 @@ def validate_odds_renaming():
     return test_odds, expected
 
 # Usage in merge_and_summarize():
-# 1. Extract odds: raw_odds = extract_odds(enriched_match)
-# 2. Select company: Iterate PREFERRED_COMPANIES, check if has data
-# 3. Filter by minutes: selected_odds = filter_odds_by_minutes(raw_odds[company_id])
-# 4. Add to summary: summary["money_line"] = selected_odds.get("money_line", [])
+# 1. Select company: company_id, _, company_odds = select_company_odds(match_odds)
+#    (iterates PREFERRED_COMPANIES, checks if it has data)
+# 2. Rename and filter by minutes: selected_odds = filter_odds_by_minutes(extract_company_odds(company_odds))
+# 3. Add to summary: summary["money_line"] = selected_odds.get("money_line", [])
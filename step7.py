@@ -45,18 +45,71 @@ INPUT/OUTPUT:
 
 import json
 import logging
-import re
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-import pytz
+from zoneinfo import ZoneInfo
+
+# orjson parses step2.json several times faster; fall back to the stdlib
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # ---------------------------------------------------------------------------
 # Constants and Path Configurations
 # ---------------------------------------------------------------------------
-TZ = pytz.timezone("America/New_York")
+TZ = ZoneInfo("America/New_York")
 BASE_DIR = Path(__file__).resolve().parent
 STEP2_OUTPUT = BASE_DIR / "step2.json"
-STATUS_FILTER = {2, 3, 4, 5, 6, 7}
+STATUS_FILTER = frozenset({2, 3, 4, 5, 6, 7})
+STATUS_ORDER = {2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 7: 6}
+STATUS_DESCRIPTIONS = {
+    0: "Abnormal (suggest hiding)",
+    1: "Not started",
+    2: "First half",
+    3: "Half-time",
+    4: "Second half",
+    5: "Overtime",
+    6: "Overtime (deprecated)",
+    7: "Penalty Shoot-out",
+    8: "End",
+    9: "Delay",
+    10: "Interrupt",
+    11: "Cut in half",
+    12: "Cancel",
+    13: "To be determined"
+}
+
+# Team-name indicators per country, flattened to (indicator, country) pairs
+# in priority order so infer_country_from_teams scans a single tuple
+_COUNTRY_INDICATOR_GROUPS = {
+    "australia": ["australia", "aussie", "socceroos", "matildas"],
+    "argentina": ["argentina", "boca", "river plate", "racing club"],
+    "brazil": ["brazil", "sao paulo", "flamengo", "corinthians", "palmeiras"],
+    "england": ["england", "manchester", "liverpool", "chelsea", "arsenal", "tottenham"],
+    "spain": ["spain", "real madrid", "barcelona", "atletico", "sevilla", "valencia"],
+    "germany": ["germany", "bayern", "borussia", "schalke", "hamburg"],
+    "france": ["france", "psg", "marseille", "lyon", "monaco", "saint-etienne"],
+    "italy": ["italy", "juventus", "inter", "milan", "roma", "napoli", "lazio"],
+    "netherlands": ["netherlands", "ajax", "psv", "feyenoord"],
+    "portugal": ["portugal", "porto", "benfica", "sporting"],
+    "mexico": ["mexico", "america", "guadalajara", "cruz azul", "pumas"],
+    "usa": ["usa", "united states", "la galaxy", "seattle sounders", "new york"],
+    "south korea": ["korea", "seoul", "busan", "daegu"],
+    "japan": ["japan", "tokyo", "osaka", "yokohama", "kashima"],
+    "china": ["china", "beijing", "shanghai", "guangzhou"],
+    "russia": ["russia", "moscow", "spartak", "cska", "dynamo", "zenit"],
+    "norway": ["norway", "oslo", "bergen"],
+    "czech republic": ["czech", "praha", "prague", "brno"],
+    "austria": ["austria", "vienna", "salzburg"]
+}
+COUNTRY_INDICATORS = tuple(
+    (indicator, country)
+    for country, indicators in _COUNTRY_INDICATOR_GROUPS.items()
+    for indicator in indicators
+)
 
 
 # ---------------------------------------------------------------------------
@@ -68,23 +121,7 @@ def get_eastern_time() -> str:
 
 
 def get_status_description(status_id: int) -> str:
-    status_map = {
-        0: "Abnormal (suggest hiding)",
-        1: "Not started",
-        2: "First half",
-        3: "Half-time",
-        4: "Second half",
-        5: "Overtime",
-        6: "Overtime (deprecated)",
-        7: "Penalty Shoot-out",
-        8: "End",
-        9: "Delay",
-        10: "Interrupt",
-        11: "Cut in half",
-        12: "Cancel",
-        13: "To be determined"
-    }
-    return status_map.get(status_id, f"Unknown ({status_id})")
+    return STATUS_DESCRIPTIONS.get(status_id, f"Unknown ({status_id})")
 
 
 # ---------------------------------------------------------------------------
@@ -123,10 +160,8 @@ def print_process_info(message: str):
 def get_daily_fetch_count() -> int:
     counter_file = BASE_DIR / "step6" / "daily_fetch_counter.txt"
     try:
-        if counter_file.exists():
-            content = counter_file.read_text().strip()
-            return int(content) if content else 1
-        return 1
+        content = counter_file.read_text().strip()
+        return int(content) if content else 1
     except:
         return 1
 
@@ -140,50 +175,18 @@ def infer_country_from_teams(match_data):
     else:
         competition = str(competition).lower()
     
-    country_indicators = {
-        "australia": ["australia", "aussie", "socceroos", "matildas"],
-        "argentina": ["argentina", "boca", "river plate", "racing club"],
-        "brazil": ["brazil", "sao paulo", "flamengo", "corinthians", "palmeiras"],
-        "england": ["england", "manchester", "liverpool", "chelsea", "arsenal", "tottenham"],
-        "spain": ["spain", "real madrid", "barcelona", "atletico", "sevilla", "valencia"],
-        "germany": ["germany", "bayern", "borussia", "schalke", "hamburg"],
-        "france": ["france", "psg", "marseille", "lyon", "monaco", "saint-etienne"],
-        "italy": ["italy", "juventus", "inter", "milan", "roma", "napoli", "lazio"],
-        "netherlands": ["netherlands", "ajax", "psv", "feyenoord"],
-        "portugal": ["portugal", "porto", "benfica", "sporting"],
-        "mexico": ["mexico", "america", "guadalajara", "cruz azul", "pumas"],
-        "usa": ["usa", "united states", "la galaxy", "seattle sounders", "new york"],
-        "south korea": ["korea", "seoul", "busan", "daegu"],
-        "japan": ["japan", "tokyo", "osaka", "yokohama", "kashima"],
-        "china": ["china", "beijing", "shanghai", "guangzhou"],
-        "russia": ["russia", "moscow", "spartak", "cska", "dynamo", "zenit"],
-        "norway": ["norway", "oslo", "bergen"],
-        "czech republic": ["czech", "praha", "prague", "brno"],
-        "austria": ["austria", "vienna", "salzburg"]
-    }
-    
     if "international" in competition and "friendly" in competition:
-        home_countries, away_countries = [], []
-        for country, indicators in country_indicators.items():
-            for indicator in indicators:
-                if indicator in home_team:
-                    home_countries.append(country)
-                if indicator in away_team:
-                    away_countries.append(country)
-        if home_countries and away_countries and home_countries[0] != away_countries[0]:
+        home_country = next((country for indicator, country in COUNTRY_INDICATORS if indicator in home_team), None)
+        away_country = next((country for indicator, country in COUNTRY_INDICATORS if indicator in away_team), None)
+        if home_country and away_country and home_country != away_country:
             return "International"
-        if home_countries and not away_countries:
-            return home_countries[0].title()
-        if away_countries and not home_countries:
-            return away_countries[0].title()
-        if home_countries and away_countries and home_countries[0] == away_countries[0]:
-            return home_countries[0].title()
+        if home_country or away_country:
+            return (home_country or away_country).title()
 
     team_text = f"{home_team} {away_team}"
-    for country, indicators in country_indicators.items():
-        for indicator in indicators:
-            if indicator in team_text:
-                return country.title()
+    for indicator, country in COUNTRY_INDICATORS:
+        if indicator in team_text:
+            return country.title()
     return "Unknown"
 
 
@@ -191,48 +194,49 @@ def infer_country_from_teams(match_data):
 # Sorting and Filtering Functions
 # ---------------------------------------------------------------------------
 def sort_matches_by_competition_and_time(matches: dict) -> dict:
-    competition_groups = {}
+    # Each competition keeps the country resolved for its first match, so
+    # inference runs once per competition and never splits a group.
+    competition_countries = {}
+    keyed = []
     for match_id, match_data in matches.items():
-        comp = match_data.get("competition", "Unknown Competition")
+        competition = match_data.get("competition", "Unknown Competition")
+        comp = competition
         if isinstance(comp, dict):
             comp = comp.get("name", "Unknown Competition")
         elif comp is None:
             comp = "Unknown Competition"
 
-        country = match_data.get("competition", {}).get("country", "Unknown") if isinstance(match_data.get("competition"), dict) else "Unknown"
-        if country in [None, "None", "Unknown"]:
-            country = infer_country_from_teams(match_data)
-
-        if comp not in competition_groups:
-            competition_groups[comp] = {"country": country, "matches": []}
-        competition_groups[comp]["matches"].append((match_id, match_data))
-
-    status_order = {2: 1, 3: 2, 4: 3, 5: 4, 6: 5, 7: 6}
-    for comp in competition_groups:
-        competition_groups[comp]["matches"].sort(
-            key=lambda item: (
-                status_order.get(item[1].get("status_id", 99), 99),
-                item[1].get("match_id", "")
-            )
-        )
-
-    sorted_comps = sorted(
-        competition_groups.items(),
-        key=lambda item: (item[1]["country"] or "Unknown", item[0])
-    )
-    return {comp: data["matches"] for comp, data in sorted_comps}
+        country = competition_countries.get(comp)
+        if country is None:
+            country = competition.get("country", "Unknown") if isinstance(competition, dict) else "Unknown"
+            if country in [None, "None", "Unknown"]:
+                country = infer_country_from_teams(match_data)
+            competition_countries[comp] = country
+
+        keyed.append((
+            (country or "Unknown", comp,
+             STATUS_ORDER.get(match_data.get("status_id", 99), 99),
+             match_data.get("match_id", "")),
+            comp, match_id, match_data,
+        ))
+
+    keyed.sort(key=itemgetter(0))
+    return {
+        comp: [(match_id, match_data) for _, _, match_id, match_data in group]
+        for comp, group in groupby(keyed, key=itemgetter(1))
+    }
 
 
 # ---------------------------------------------------------------------------
 # Display Functions
 # ---------------------------------------------------------------------------
-def write_main_header(fetch_count: int, total: int, generated_at: str, pipeline_time=None):
+def write_main_header(fetch_count: int, total: int, generated_at: str, pipeline_time=None, filter_time=None):
     """Write the main header to console only (process logging)."""
     header = (
         f"\n{'='*80}\n"
         f"🔥 STEP 7: STATUS FILTER (2–7)\n"
         f"{'='*80}\n"
-        f"Filter Time: {get_eastern_time()}\n"
+        f"Filter Time: {filter_time or get_eastern_time()}\n"
         f"Data Generated: {generated_at}\n"
         f"Pipeline Time: {pipeline_time or 'Not provided'}\n"
         f"Daily Fetch: #{fetch_count}\n"
@@ -243,7 +247,7 @@ def write_main_header(fetch_count: int, total: int, generated_at: str, pipeline_
     print_process_info(header)
 
 
-def write_main_footer(fetch_count: int, total: int, generated_at: str, pipeline_time=None, matches=None):
+def write_main_footer(fetch_count: int, total: int, generated_at: str, pipeline_time=None, matches=None, status_counts=None):
     """Write the main footer to console only (process logging)."""
     footer = (
         f"\n{'='*80}\n"
@@ -256,18 +260,19 @@ def write_main_footer(fetch_count: int, total: int, generated_at: str, pipeline_
     )
     print_process_info(footer)
     
-    if matches and total > 0:
+    if status_counts is None and matches:
         status_counts = {}
         for match_data in matches.values():
             status_id = match_data.get("status_id")
             if status_id in STATUS_FILTER:
                 status_counts[status_id] = status_counts.get(status_id, 0) + 1
+
+    if status_counts and total > 0:
         summary_footer = (
             f"\nSTEP 7 – STATUS SUMMARY\n"
             f"{'='*60}\n"
         )
-        for status_id in sorted(status_counts.keys()):
-            count = status_counts[status_id]
+        for status_id, count in sorted(status_counts.items()):
             desc = get_status_description(status_id)
             summary_footer += f"{desc} (ID: {status_id}): {count}\n"
         summary_footer += f"Total: {total}\n" f"{'='*60}\n"
@@ -387,13 +392,17 @@ def run_step7(matches_list: dict = None):
       3. Sort by competition & time.
       4. Pretty-print each competition group to the console + log.
     """
+    # One timestamp for this run's start (header and in-memory data time)
+    run_time = get_eastern_time()
+
     # 1) Load from disk if needed
     if matches_list is None:
-        if not STEP2_OUTPUT.exists():
+        try:
+            with open(STEP2_OUTPUT, "rb") as f:
+                all_data = _json_loads(f.read())
+        except FileNotFoundError:
             print_process_info(f"Error: Cannot find {STEP2_OUTPUT.name} for Step 7.")
             return
-        with open(STEP2_OUTPUT, "r", encoding="utf-8") as f:
-            all_data = json.load(f)
         # The top‐level has "history" plus other keys; take the last entry's "matches"
         history = all_data.get("history", [])
         if not history:
@@ -401,18 +410,20 @@ def run_step7(matches_list: dict = None):
             return
         last_batch = history[-1]
         raw_matches = last_batch.get("matches", {})
-        generated_at = last_batch.get("timestamp", get_eastern_time())
+        generated_at = last_batch.get("timestamp", run_time)
     else:
         # Already a dict of matches
         raw_matches = matches_list
-        generated_at = get_eastern_time()
-
-    # 2) Filter status_id ∈ STATUS_FILTER
-    filtered = {
-        mid: mdata
-        for mid, mdata in raw_matches.items()
-        if mdata.get("status_id") in STATUS_FILTER
-    }
+        generated_at = run_time
+
+    # 2) Filter status_id ∈ STATUS_FILTER, tallying statuses in the same pass
+    filtered = {}
+    status_counts = {}
+    for mid, mdata in raw_matches.items():
+        status_id = mdata.get("status_id")
+        if status_id in STATUS_FILTER:
+            filtered[mid] = mdata
+            status_counts[status_id] = status_counts.get(status_id, 0) + 1
     total = len(filtered)
     fetch_count = get_daily_fetch_count()
 
@@ -420,7 +431,7 @@ def run_step7(matches_list: dict = None):
     sorted_groups = sort_matches_by_competition_and_time(filtered)
 
     # 4) Write header
-    write_main_header(fetch_count, total, generated_at, pipeline_time=None)
+    write_main_header(fetch_count, total, generated_at, pipeline_time=None, filter_time=run_time)
 
     # 5) Loop through each competition group
     for competition, matches_list in sorted_groups.items():
@@ -467,7 +478,7 @@ def run_step7(matches_list: dict = None):
             log_field_data("-"*80)
 
     # 6) Write footer
-    write_main_footer(fetch_count, total, generated_at, pipeline_time=None, matches=filtered)
+    write_main_footer(fetch_count, total, generated_at, pipeline_time=None, matches=filtered, status_counts=status_counts)
     print_process_info("Step 7: Completed.")
 
 
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for step2's merge (merge_and_summarize) and save (save_match_summaries) paths
+"""
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import step2
+
+
+def odds_row(minute, timestamp=1000):
+    """One API odds entry: [timestamp, minute, val1, val2, val3, status, sealed, score]."""
+    return [timestamp, minute, 1.9, 2.5, 2.1, 2, 0, "0-0"]
+
+
+def sample_step1_tables():
+    """Live matches plus the enrichment tables step1 writes, for two matches."""
+    live_matches = [
+        {"id": "m1", "home_scores": [1, 0], "away_scores": [0, 0]},
+        {"id": "m2", "status_id": 8, "home": {"name": "Live Home"}},
+        {"id": ""},
+    ]
+    match_details = {
+        "m1": {"results": [{"id": "m1", "status_id": 4, "home_team_id": "t1",
+                            "away_team_id": "t2", "competition_id": "c1",
+                            "environment": {"weather": "5", "temperature": "20°C", "wind": "3.0m/s"}}]},
+        "m2": {"results": [{"id": "m2", "status_id": 2, "competition_id": "c2"}]},
+    }
+    match_odds = {
+        "m1": {"results": {
+            "4": {"eu": [odds_row("3")]},
+            "2": {"eu": [odds_row("3", 1000), odds_row("3", 1001), odds_row("9")],
+                  "asia": [odds_row("5")]},
+        }},
+        "m2": {"results": {"99": {"eu": [odds_row("3")]}}},
+    }
+    team_info = {
+        "t1": {"results": [{"name": "Home FC", "short_name": "HFC", "logo": ""}]},
+        "t2": {"results": [{"name": "Away FC", "short_name": "AFC", "logo": ""}]},
+    }
+    competition_info = {
+        "c1": {"results": [{"name": "League One", "short_name": "L1", "logo": "", "country_id": "k1"}]},
+    }
+    country_names = {"k1": "Testland"}
+    return live_matches, match_details, match_odds, team_info, competition_info, country_names
+
+
+class TestMergeAndSummarize(unittest.TestCase):
+    def setUp(self):
+        self.tables = sample_step1_tables()
+        self.summaries = step2.merge_and_summarize(*copy.deepcopy(self.tables))
+
+    def test_matches_without_id_are_skipped(self):
+        self.assertEqual([s["match_id"] for s in self.summaries], ["m1", "m2"])
+
+    def test_details_and_lookups_are_merged(self):
+        summary = self.summaries[0]
+        self.assertEqual(summary["home"], "Home FC")
+        self.assertEqual(summary["away"], "Away FC")
+        self.assertEqual(summary["competition"], "League One")
+        self.assertEqual(summary["country"], "Testland")
+        self.assertEqual(summary["score"], "0-0")
+        self.assertEqual(summary["status_id"], 4)
+        self.assertEqual(summary["status"], 4)
+        self.assertEqual(summary["environment"]["weather_description"], "Sunny")
+
+    def test_integer_ids_are_matched_as_strings(self):
+        tables = sample_step1_tables()
+        tables[0][:] = [{"id": 0}, {"id": None}]
+        tables[1]["0"] = tables[1].pop("m1")
+        tables[2][0] = tables[2].pop("m1")
+        summaries = step2.merge_and_summarize(*tables)
+        self.assertEqual([s["match_id"] for s in summaries], [0])
+        self.assertEqual(summaries[0]["home"], "Home FC")
+        self.assertEqual(summaries[0]["odds_company_id"], "2")
+
+    def test_live_fields_win_over_details(self):
+        summary = self.summaries[1]
+        self.assertEqual(summary["home"], "Live Home")
+        self.assertEqual(summary["status_id"], 8)
+
+    def test_preferred_company_odds_are_selected_and_filtered(self):
+        summary = self.summaries[0]
+        self.assertEqual(summary["odds_company_id"], "2")
+        self.assertEqual(summary["odds_company_name"], "BET365")
+        self.assertEqual(list(summary["odds"]), ["2"])
+        # Latest entry per minute in the 2-6 window; minute 9 is dropped
+        self.assertEqual(summary["money_line"], [odds_row("3", 1001)])
+        self.assertEqual(summary["spread"], [odds_row("5")])
+
+    def test_unknown_company_gives_no_odds(self):
+        summary = self.summaries[1]
+        self.assertIsNone(summary["odds_company_id"])
+        self.assertEqual(summary["odds"], {})
+        self.assertEqual(summary["money_line"], [])
+
+    def test_malformed_company_entry_is_skipped(self):
+        tables = sample_step1_tables()
+        tables[2]["m1"] = {"results": {"2": ["garbage"], "4": {"eu": [odds_row("3")]}}}
+        summary = step2.merge_and_summarize(*tables)[0]
+        self.assertEqual(summary["odds_company_id"], "4")
+        self.assertEqual(summary["money_line"], [odds_row("3")])
+
+    def test_list_shaped_odds_give_no_odds(self):
+        tables = sample_step1_tables()
+        tables[2]["m1"] = {"results": [{"eu": [odds_row("3")]}]}
+        summary = step2.merge_and_summarize(*tables)[0]
+        self.assertIsNone(summary["odds_company_id"])
+        self.assertEqual(summary["odds"], {})
+
+    def test_input_matches_are_not_modified(self):
+        live_matches = copy.deepcopy(self.tables[0])
+        step2.merge_and_summarize(live_matches, *self.tables[1:])
+        self.assertEqual(live_matches, self.tables[0])
+
+    def test_output_is_json_serializable(self):
+        self.assertEqual(json.loads(json.dumps(self.summaries)), self.summaries)
+
+
+class TestFilterOddsByMinutes(unittest.TestCase):
+    odds = {"money_line": [odds_row("7"), odds_row("4", 1001), odds_row("4", 1000),
+                           odds_row(2), odds_row("x"), [1000]]}
+
+    def test_default_window(self):
+        self.assertEqual(step2.filter_odds_by_minutes(self.odds),
+                         {"money_line": [odds_row(2), odds_row("4", 1001)]})
+
+    def test_wide_window_keeps_minute_order(self):
+        filtered = step2.filter_odds_by_minutes(self.odds, min_minute=0, max_minute=10**6)
+        self.assertEqual(filtered, {"money_line": [odds_row(2), odds_row("4", 1001), odds_row("7")]})
+
+
+class TestSaveMatchSummaries(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_file = str(Path(self.test_dir) / "step2.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def load_output(self):
+        with open(self.output_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_round_trip(self):
+        summaries = step2.merge_and_summarize(*sample_step1_tables())
+        data = {"metadata": {"total_matches": len(summaries)}, "summaries": summaries}
+        self.assertTrue(step2.save_match_summaries(data, self.output_file))
+        self.assertEqual(self.load_output(), json.loads(json.dumps(data)))
+
+    def test_pretty_output(self):
+        data = {"summaries": [{"a": 1}], "metadata": {"b": "ü"}}
+        self.assertTrue(step2.save_match_summaries(data, self.output_file, pretty=True))
+        self.assertEqual(self.load_output(), data)
+
+    def test_resave_writes_current_summaries(self):
+        data = {"summaries": [{"a": 1}]}
+        self.assertTrue(step2.save_match_summaries(data, self.output_file))
+        data["summaries"].append({"a": 2})
+        self.assertTrue(step2.save_match_summaries(data, self.output_file))
+        self.assertEqual(self.load_output(), {"summaries": [{"a": 1}, {"a": 2}]})
+        data["summaries"][0]["a"] = 3
+        self.assertTrue(step2.save_match_summaries(data, self.output_file))
+        self.assertEqual(self.load_output(), {"summaries": [{"a": 3}, {"a": 2}]})
+
+    def test_failed_save_leaves_no_files(self):
+        self.assertFalse(step2.save_match_summaries({"summaries": [object()]}, self.output_file))
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_failed_save_keeps_previous_output(self):
+        self.assertTrue(step2.save_match_summaries({"summaries": [{"a": 1}]}, self.output_file))
+        self.assertFalse(step2.save_match_summaries({"summaries": [object()]}, self.output_file))
+        self.assertEqual(os.listdir(self.test_dir), ["step2.json"])
+        self.assertEqual(self.load_output(), {"summaries": [{"a": 1}]})
+
+    def test_empty_payload(self):
+        self.assertTrue(step2.save_match_summaries({}, self.output_file))
+        self.assertEqual(self.load_output(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()